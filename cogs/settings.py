@@ -25,5 +25,43 @@ class SettingsCog(commands.Cog):
         await db.set_guild_notify_time(interaction.guild_id, minutes)
         await interaction.response.send_message(f"✅ 設定を保存しました。\n今後、イベント開始の **{minutes}分前** に参加者へ通知を送ります。", ephemeral=True)
 
+    @settings_group.command(name="many_reminder", description="多めモードの通知回数と間隔を設定します")
+    @app_commands.describe(rounds="通知する回数 (1〜10)", interval="通知の間隔(分) (1〜60)")
+    async def set_many_reminder(self, interaction: discord.Interaction, rounds: int, interval: int):
+        # 権限チェック (管理者のみ)
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("このコマンドを実行するには管理者権限が必要です。", ephemeral=True)
+            return
+
+        if not 1 <= rounds <= 10 or not 1 <= interval <= 60:
+            await interaction.response.send_message("回数は1〜10回、間隔は1〜60分の範囲で指定してください。", ephemeral=True)
+            return
+
+        # 全ラウンドがイベント開始前に収まるよう、事前通知時間で上限をかける
+        notify_minutes = await db.get_guild_notify_time(interaction.guild_id)
+        if (rounds - 1) * interval >= notify_minutes:
+            await interaction.response.send_message(
+                f"通知が開始時刻を過ぎてしまいます。(回数 - 1) × 間隔 は事前通知時間 ({notify_minutes}分) 未満にしてください。",
+                ephemeral=True
+            )
+            return
+
+        await db.set_guild_many_settings(interaction.guild_id, rounds, interval)
+        await interaction.response.send_message(f"✅ 設定を保存しました。\n多めモードでは **{interval}分間隔で{rounds}回** チャンネルに通知します。", ephemeral=True)
+
+    @settings_group.command(name="dm", description="多めモードのリマインダーをDMでも受け取るか設定します")
+    @app_commands.describe(enabled="DMで受け取る場合は True")
+    async def set_dm(self, interaction: discord.Interaction, enabled: bool):
+        # 個人設定のため権限チェックは不要 (サーバーごとの設定なのでDMからは不可)
+        if interaction.guild_id is None:
+            await interaction.response.send_message("このコマンドはサーバー内で実行してください。", ephemeral=True)
+            return
+
+        await db.set_dm_optin(interaction.guild_id, interaction.user.id, enabled)
+        if enabled:
+            await interaction.response.send_message("✅ 多めモードのリマインダーをDMでも受け取ります。", ephemeral=True)
+        else:
+            await interaction.response.send_message("✅ 多めモードのリマインダーはチャンネル通知のみになります。", ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(SettingsCog(bot))
\ No newline at end of file
@@ -13,6 +13,13 @@ from PIL import Image, ImageDraw, ImageFont
 # 日本時間 (JST) 定義
 JST = datetime.timezone(datetime.timedelta(hours=9))
 
+def utc_now():
+    """現在時刻 (UNIXタイムスタンプ)。負荷試験ツールではシミュレーション時計に差し替える"""
+    return datetime.datetime.now(datetime.timezone.utc).timestamp()
+
+# 多めモードのジョブがこれ以上遅れた場合は送信しない (秒, 最短の通知間隔に合わせる)
+MANY_JOB_STALE_SECONDS = 60
+
 class TicketView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=None)
@@ -183,10 +190,14 @@ class TicketsCog(commands.Cog):
         self.bot = bot
         # {message_id: {'task': Task, 'codes': {uid: code}, 'remaining': {uid}}}
         self.active_spams = {} 
+        # 前回のジョブ処理の開始時刻 (起動直後は None)
+        self.last_job_tick = None
         self.reminder_loop.start()
+        self.reminder_job_loop.start()
 
     def cog_unload(self):
         self.reminder_loop.cancel()
+        self.reminder_job_loop.cancel()
         for spam_data in self.active_spams.values():
             spam_data['task'].cancel()
 
@@ -238,7 +249,7 @@ class TicketsCog(commands.Cog):
     async def reminder_loop(self):
         try:
             events = await db.get_upcoming_events()
-            now = datetime.datetime.now(datetime.timezone.utc).timestamp()
+            now = utc_now()
 
             for event in events:
                 minutes_before = await db.get_guild_notify_time(event['guild_id'])
@@ -262,7 +273,7 @@ class TicketsCog(commands.Cog):
         if mode == 'normal':
             await self.send_normal_reminder(event)
         elif mode == 'many':
-            asyncio.create_task(self.send_many_reminders(event))
+            await self.schedule_many_reminders(event)
         elif mode == 'brutal':
             asyncio.create_task(self.start_brutal_spam(event))
 
@@ -278,25 +289,74 @@ class TicketsCog(commands.Cog):
                 try: await member.send(text)
                 except: pass
 
-    async def send_many_reminders(self, event):
-        _, participants = await db.get_event_data(event['message_id'])
+    async def schedule_many_reminders(self, event):
+        """多めモードの各ラウンドをDBにジョブとして登録する"""
+        rounds, interval_minutes = await db.get_guild_many_settings(event['guild_id'])
+        now = utc_now()
+        # 同時刻のイベントが集中しないよう、イベントごとに分内の送信位置をずらす
+        offset = self.spread_offset(event['message_id'])
+        run_times = [now + offset + i * interval_minutes * 60 for i in range(rounds)]
+        # 開始時刻を過ぎるラウンドは登録しない (最低1回は即時に送る)
+        run_times = [t for t in run_times if t < event['start_timestamp']] or [now]
+        await db.schedule_reminder_jobs(event['message_id'], run_times)
+
+    @staticmethod
+    def spread_offset(message_id):
+        """メッセージIDから 0〜59 秒の送信オフセットを決定的に算出"""
+        # Snowflakeの上位ビットはミリ秒単位の作成時刻なので、分内で均等に散らばる
+        return (message_id >> 22) % 60
+
+    @tasks.loop(seconds=5)
+    async def reminder_job_loop(self):
+        try:
+            tick_start = utc_now()
+            jobs = await db.claim_due_reminder_jobs(tick_start)
+        except Exception as e:
+            print(f"Job Loop Error: {e}")
+            return
+
+        # 停止中に溜まったジョブを一斉送信しないよう、古すぎるものは破棄する。
+        # 前回の処理が長引いても、その間に期限が来たジョブは破棄しないよう
+        # 経過時間は前回の処理開始時刻 (起動直後は今回の開始時刻) から測る
+        since = self.last_job_tick if self.last_job_tick is not None else tick_start
+        self.last_job_tick = tick_start
+        stale = [job for job in jobs if job['run_at'] < since - MANY_JOB_STALE_SECONDS]
+        if stale:
+            print(f"Job Dropped: {len(stale)} stale reminder jobs (ids={[job['id'] for job in stale]})")
+            jobs = [job for job in jobs if job['run_at'] >= since - MANY_JOB_STALE_SECONDS]
+
+        for job in jobs:
+            try:
+                await self.send_many_round(job)
+            except Exception as e:
+                print(f"Job Error (id={job['id']}): {e}")
+
+    async def send_many_round(self, job):
+        """多めモードの1ラウンド分: チャンネルへのまとめ投稿1件 + DM希望者のみDM"""
+        data = await db.get_event_data(job['event_message_id'])
+        if not data: return
+        event, participants = data
         if not participants: return
+        if event['start_timestamp'] is not None and event['start_timestamp'] <= utc_now(): return
         guild = self.bot.get_guild(event['guild_id'])
-        channel = guild.get_channel(event['channel_id']) if guild else None
-        
+        if not guild: return
+        channel = guild.get_channel(event['channel_id'])
+
+        header = f"⏰ **[しつこめ通知 {job['round_index'] + 1}/{job['total_rounds']}] まもなく開始です！**"
+        text = self.create_reminder_text(event, header)
         mentions = " ".join([f"<@{uid}>" for uid in participants])
-        text = self.create_reminder_text(event, "⏰ **[しつこめ通知] まもなく開始です！**")
 
-        for i in range(3):
-            if channel:
-                try: await channel.send(f"{mentions}\n{text}")
+        if channel:
+            try: await channel.send(f"{mentions}\n{text}")
+            except: pass
+
+        dm_users = await db.get_dm_optin_users(event['guild_id'], participants)
+        for uid in participants:
+            if uid not in dm_users: continue
+            member = guild.get_member(uid)
+            if member:
+                try: await member.send(text)
                 except: pass
-            for uid in participants:
-                member = guild.get_member(uid)
-                if member:
-                    try: await member.send(text)
-                    except: pass
-            await asyncio.sleep(60)
 
     # --- 鬼畜モード関連 ---
 
@@ -434,5 +494,9 @@ class TicketsCog(commands.Cog):
     async def before_reminder(self):
         await self.bot.wait_until_ready()
 
+    @reminder_job_loop.before_loop
+    async def before_reminder_job(self):
+        await self.bot.wait_until_ready()
+
 async def setup(bot):
     await bot.add_cog(TicketsCog(bot))
\ No newline at end of file
@@ -43,7 +43,31 @@ class Database:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS guild_settings (
                     guild_id INTEGER PRIMARY KEY,
-                    notify_minutes INTEGER DEFAULT 15
+                    notify_minutes INTEGER DEFAULT 15,
+                    many_rounds INTEGER DEFAULT 3,
+                    many_interval_minutes INTEGER DEFAULT 1
+                )
+            """)
+
+            # 4. リマインダージョブテーブル作成 (多めモードの各ラウンド)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS reminder_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    event_message_id INTEGER,
+                    round_index INTEGER,
+                    total_rounds INTEGER,
+                    run_at REAL,
+                    FOREIGN KEY(event_message_id) REFERENCES events(message_id)
+                )
+            """)
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_reminder_jobs_run_at ON reminder_jobs (run_at)")
+
+            # 5. DM受信希望ユーザーテーブル作成
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS dm_optins (
+                    guild_id INTEGER,
+                    user_id INTEGER,
+                    PRIMARY KEY (guild_id, user_id)
                 )
             """)
             
@@ -63,6 +87,16 @@ class Database:
             except Exception:
                 pass
 
+            try:
+                await db.execute("ALTER TABLE guild_settings ADD COLUMN many_rounds INTEGER DEFAULT 3")
+            except Exception:
+                pass
+
+            try:
+                await db.execute("ALTER TABLE guild_settings ADD COLUMN many_interval_minutes INTEGER DEFAULT 1")
+            except Exception:
+                pass
+
             await db.commit()
 
     # --- イベント関連 ---
@@ -104,6 +138,7 @@ class Database:
         async with aiosqlite.connect(self.db_path) as db:
             await db.execute("DELETE FROM events WHERE message_id = ?", (message_id,))
             await db.execute("DELETE FROM participants WHERE event_message_id = ?", (message_id,))
+            await db.execute("DELETE FROM reminder_jobs WHERE event_message_id = ?", (message_id,))
             await db.commit()
 
     # --- リマインダー・設定関連 ---
@@ -133,4 +168,64 @@ class Database:
                 row = await cursor.fetchone()
                 return row[0] if row else 15  # デフォルト15分
 
+    async def set_guild_many_settings(self, guild_id, rounds, interval_minutes):
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("""
+                INSERT INTO guild_settings (guild_id, many_rounds, many_interval_minutes) VALUES (?, ?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET many_rounds = excluded.many_rounds, many_interval_minutes = excluded.many_interval_minutes
+            """, (guild_id, rounds, interval_minutes))
+            await db.commit()
+
+    async def get_guild_many_settings(self, guild_id):
+        """多めモードの (回数, 間隔[分]) を取得"""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute("SELECT many_rounds, many_interval_minutes FROM guild_settings WHERE guild_id = ?", (guild_id,)) as cursor:
+                row = await cursor.fetchone()
+                if not row or row[0] is None or row[1] is None:
+                    return 3, 1  # デフォルト3回・1分間隔
+                return row[0], row[1]
+
+    # --- リマインダージョブ関連 ---
+    async def schedule_reminder_jobs(self, message_id, run_times):
+        """多めモードの各ラウンドをジョブとして登録"""
+        total = len(run_times)
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany("""
+                INSERT INTO reminder_jobs (event_message_id, round_index, total_rounds, run_at)
+                VALUES (?, ?, ?, ?)
+            """, [(message_id, i, total, run_at) for i, run_at in enumerate(run_times)])
+            await db.commit()
+
+    async def claim_due_reminder_jobs(self, now):
+        """実行時刻を過ぎたジョブを取得し、テーブルから削除する (二重送信防止)"""
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute("SELECT * FROM reminder_jobs WHERE run_at <= ? ORDER BY run_at", (now,)) as cursor:
+                jobs = [dict(row) for row in await cursor.fetchall()]
+            if jobs:
+                await db.executemany("DELETE FROM reminder_jobs WHERE id = ?", [(job['id'],) for job in jobs])
+                await db.commit()
+            return jobs
+
+    # --- DM受信設定関連 ---
+    async def set_dm_optin(self, guild_id, user_id, enabled):
+        async with aiosqlite.connect(self.db_path) as db:
+            if enabled:
+                await db.execute("INSERT OR IGNORE INTO dm_optins (guild_id, user_id) VALUES (?, ?)", (guild_id, user_id))
+            else:
+                await db.execute("DELETE FROM dm_optins WHERE guild_id = ? AND user_id = ?", (guild_id, user_id))
+            await db.commit()
+
+    async def get_dm_optin_users(self, guild_id, user_ids):
+        """指定ユーザーのうちDM受信を希望しているユーザーIDを返す"""
+        if not user_ids:
+            return set()
+        placeholders = ",".join("?" * len(user_ids))
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(
+                f"SELECT user_id FROM dm_optins WHERE guild_id = ? AND user_id IN ({placeholders})",
+                (guild_id, *user_ids)
+            ) as cursor:
+                return {row[0] for row in await cursor.fetchall()}
+
 db = Database()
\ No newline at end of file
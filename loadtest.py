@@ -0,0 +1,799 @@
+"""募集・リマインダー処理の負荷試験ツール
+
+実際のハンドラ (TicketView / RecruitModal / TicketsCog / Database) を、
+Discord APIを偽装したオブジェクトとシミュレーション時計で駆動します。
+1日分のリマインダーも数秒〜数十秒で実行できます。
+
+使い方:
+    # 合成負荷を生成して実行 (--record で操作ログを保存)
+    python loadtest.py --guilds 20 --recruits-per-hour 3 --hours 24 --record run.jsonl
+
+    # 保存した操作ログを再生
+    python loadtest.py --replay run.jsonl
+
+操作ログ (JSONL) の1行の形式:
+    {"t": 秒 (開始時刻からの経過), "action": "recruit" | "join" | "leave" | "dm_optin",
+     "ref": 募集の識別子, "guild": ギルドID, "user": ユーザーID, ...}
+先頭行はヘッダー {"header": true, "start": 開始時刻 (ISO形式), "seed": シード} です。
+"""
+import argparse
+import asyncio
+import contextvars
+import datetime
+import heapq
+import itertools
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import types
+from collections import Counter, defaultdict
+
+JST = datetime.timezone(datetime.timedelta(hours=9))
+DISCORD_EPOCH_MS = 1420070400000
+RATE_LIMIT_PER_SEC = 50  # Discordのグローバルレート制限 (リクエスト/秒)
+# グローバル制限の対象となる呼び出し。インタラクションへの応答 (interaction_response,
+# original_response, followup) は対象外。DMはDMチャンネル作成済みとして1回と数える
+GLOBAL_LIMITED_KINDS = {'channel_send', 'message_edit', 'message_delete', 'dm'}
+# チャンネルごとのルート制限 (回数, 秒)。Discordは値を公開していないため想定値
+CHANNEL_ROUTE_LIMIT = (5, 5)
+CHANNEL_LIMITED_KINDS = {'channel_send', 'message_edit'}
+MODE_INPUT = {'normal': '1', 'many': '2', 'brutal': '3'}
+DEFAULT_START = "2026-02-15T00:00:00+09:00"
+
+
+
+class HandlerMeasure:
+    """1回のハンドラ実行中のDB・描画時間。並行したDB呼び出しや、
+    DB待ちの間に行われた描画は重複して数えない"""
+
+    def __init__(self):
+        self.db = 0.0
+        self.render = 0.0
+        self._in_flight = 0
+        self._since = 0.0
+        self._overlap = 0.0
+
+    def db_enter(self):
+        if self._in_flight == 0:
+            self._since = time.perf_counter()
+        self._in_flight += 1
+
+    def db_exit(self):
+        self._in_flight -= 1
+        if self._in_flight == 0:
+            self.db += time.perf_counter() - self._since - self._overlap
+            self._overlap = 0.0
+
+    def add_render(self, elapsed):
+        self.render += elapsed
+        if self._in_flight:
+            self._overlap += elapsed
+
+
+# 実行中のハンドラの計測値。ハンドラ外の処理では None
+current_handler = contextvars.ContextVar('current_handler', default=None)
+
+
+# --- 計測 ---
+
+class Stats:
+    def __init__(self, api_latency_ms):
+        self.api_latency = api_latency_ms / 1000
+        self.db = defaultdict(list)          # メソッド名 -> [秒]
+        self.handlers = defaultdict(list)    # ハンドラ名 -> [(合計, DB, 描画)]
+        self.render = 0.0
+        self.db_total = 0.0                  # ハンドラ外の呼び出しも含む
+        self.api_calls = Counter()           # 種類 -> 回数
+        self.api_per_sec = Counter()         # シミュレーション秒 -> グローバル制限対象の回数
+        self.channel_windows = Counter()     # (種類, チャンネル, 窓) -> 回数
+
+    def api(self, kind, now, channel_id=None):
+        self.api_calls[kind] += 1
+        if kind in GLOBAL_LIMITED_KINDS:
+            self.api_per_sec[int(now)] += 1
+        if kind in CHANNEL_LIMITED_KINDS:
+            self.channel_windows[(kind, channel_id, int(now) // CHANNEL_ROUTE_LIMIT[1])] += 1
+
+
+def instrument_db(db, stats):
+    """Databaseの各メソッドを計測付きに差し替える"""
+    for name in dir(type(db)):
+        if name.startswith('_'):
+            continue
+        method = getattr(db, name)
+        if not asyncio.iscoroutinefunction(method):
+            continue
+
+        def wrap(fn, name=name):
+            async def timed(*args, **kwargs):
+                measured = current_handler.get()
+                if measured is not None:
+                    measured.db_enter()
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    stats.db[name].append(elapsed)
+                    stats.db_total += elapsed
+                    if measured is not None:
+                        measured.db_exit()
+            return timed
+
+        setattr(db, name, wrap(method))
+
+
+def instrument_render(cog, stats):
+    """画像生成 (鬼畜モードのキャプチャ) を計測付きに差し替える"""
+    generate = cog.generate_captcha
+
+    def timed(text):
+        start = time.perf_counter()
+        try:
+            return generate(text)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.render += elapsed
+            measured = current_handler.get()
+            if measured is not None:
+                measured.add_render(elapsed)
+
+    cog.generate_captcha = timed
+
+
+# --- シミュレーション時計 ---
+
+class SimClock:
+    """離散イベント方式の時計。sleepはシミュレーション時間で待つ"""
+
+    def __init__(self, start):
+        self.now = start
+        self._queue = []
+        self._seq = itertools.count()
+        self._tasks = set()
+        self._parked = set()
+
+    def at(self, when, callback):
+        heapq.heappush(self._queue, (when, next(self._seq), callback))
+
+    def track(self, task):
+        self._tasks.add(task)
+
+    async def sleep(self, delay):
+        if delay <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        task = asyncio.current_task()
+        self.at(self.now + delay, ('wake', future, task))
+        self._parked.add(task)
+        try:
+            await future
+        finally:
+            self._parked.discard(task)
+
+    async def settle(self):
+        """バックグラウンドタスクが全て完了するか、sleepで停止するまで待つ"""
+        while True:
+            self._tasks = {task for task in self._tasks if not task.done()}
+            if self._tasks <= self._parked:
+                return
+            await asyncio.sleep(0.0005)
+
+    async def run(self, until):
+        while self._queue and self._queue[0][0] <= until:
+            when, _, callback = heapq.heappop(self._queue)
+            self.now = max(self.now, when)
+            if isinstance(callback, tuple):
+                _, future, task = callback
+                if future.done():
+                    continue
+                self._parked.discard(task)
+                future.set_result(None)
+            else:
+                await callback()
+            await self.settle()
+        self.now = until
+
+    def cancel_all(self):
+        for task in self._tasks:
+            task.cancel()
+
+
+class SimAsyncio:
+    """cogs.tickets 内の asyncio を差し替え、sleepとタスク生成をシミュレーション時計に載せる"""
+
+    def __init__(self, clock):
+        self._clock = clock
+
+    def __getattr__(self, name):
+        return getattr(asyncio, name)
+
+    def sleep(self, delay, result=None):
+        return self._clock.sleep(delay)
+
+    def create_task(self, coro, **kwargs):
+        task = asyncio.create_task(coro, **kwargs)
+        self._clock.track(task)
+        return task
+
+
+# --- Discordオブジェクトの偽装 ---
+
+class FakeDiscord:
+    def __init__(self, clock, stats, latency=0.0):
+        self.clock = clock
+        self.stats = stats
+        self.latency = latency  # 実時間で待つAPIレイテンシ (秒)。シミュレーションでは0
+        self.guilds = {}
+        self._ids = itertools.count(1)
+
+    def snowflake(self):
+        """シミュレーション時刻から実際と同じ形式のメッセージIDを作る"""
+        ms = int(self.clock.now * 1000) - DISCORD_EPOCH_MS
+        return (ms << 22) | (next(self._ids) & 0x3FFFFF)
+
+    def guild(self, guild_id):
+        if guild_id not in self.guilds:
+            self.guilds[guild_id] = FakeGuild(self, guild_id)
+        return self.guilds[guild_id]
+
+    async def api(self, kind, channel_id=None):
+        self.stats.api(kind, self.clock.now, channel_id)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+
+class FakeGuild:
+    def __init__(self, discord, guild_id):
+        self.discord = discord
+        self.id = guild_id
+        self.channel = FakeChannel(discord, guild_id * 100 + 1)
+        self.members = {}
+
+    def get_member(self, user_id):
+        if user_id not in self.members:
+            self.members[user_id] = FakeMember(self.discord, user_id)
+        return self.members[user_id]
+
+    def get_channel(self, channel_id):
+        return self.channel if channel_id == self.channel.id else None
+
+
+class FakeMember:
+    def __init__(self, discord, user_id):
+        self.discord = discord
+        self.id = user_id
+        self.guild_permissions = types.SimpleNamespace(administrator=False)
+
+    async def send(self, *args, **kwargs):
+        await self.discord.api('dm')
+
+
+class FakeChannel:
+    def __init__(self, discord, channel_id):
+        self.discord = discord
+        self.id = channel_id
+
+    async def send(self, *args, **kwargs):
+        await self.discord.api('channel_send', self.id)
+        return FakeMessage(self.discord, self.discord.snowflake(), self.id)
+
+
+class FakeMessage:
+    def __init__(self, discord, message_id, channel_id):
+        self.discord = discord
+        self.id = message_id
+        self.channel_id = channel_id
+
+    async def edit(self, **kwargs):
+        await self.discord.api('message_edit', self.channel_id)
+
+    async def delete(self):
+        await self.discord.api('message_delete', self.channel_id)
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def send_message(self, *args, ephemeral=False, **kwargs):
+        self._done = True
+        discord = self.interaction.discord
+        await discord.api('interaction_response')
+        if not ephemeral:
+            self.interaction.sent_message = FakeMessage(discord, discord.snowflake(), self.interaction.channel_id)
+
+    async def send_modal(self, modal):
+        self._done = True
+        await self.interaction.discord.api('interaction_response')
+
+
+class FakeFollowup:
+    def __init__(self, discord):
+        self.discord = discord
+
+    async def send(self, *args, **kwargs):
+        await self.discord.api('followup')
+
+
+class FakeInteraction:
+    def __init__(self, discord, guild_id, user_id, message_id=None):
+        self.discord = discord
+        self.guild = discord.guild(guild_id)
+        self.guild_id = guild_id
+        self.channel = self.guild.channel
+        self.channel_id = self.channel.id
+        self.user = self.guild.get_member(user_id)
+        self.message = FakeMessage(discord, message_id, self.channel_id) if message_id else None
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(discord)
+        self.sent_message = None
+
+    async def original_response(self):
+        await self.discord.api('original_response')
+        return self.sent_message
+
+
+class FakeBot:
+    def __init__(self, discord):
+        self.discord = discord
+
+    def get_guild(self, guild_id):
+        return self.discord.guilds.get(guild_id)
+
+    async def wait_until_ready(self):
+        await asyncio.Event().wait()
+
+
+# --- 負荷の生成 ---
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        mode, _, weight = part.partition('=')
+        if mode not in MODE_INPUT:
+            raise argparse.ArgumentTypeError(f"unknown reminder mode: {mode}")
+        mix[mode] = float(weight)
+    return mix
+
+
+def generate_workload(args, start):
+    """シード固定で合成操作ログを生成する"""
+    rng = random.Random(args.seed)
+    modes, weights = zip(*args.mix.items())
+    duration = args.hours * 3600
+    actions = []
+
+    for guild_id in range(1, args.guilds + 1):
+        members = [guild_id * 100000 + i for i in range(args.members)]
+        for user_id in members:
+            if rng.random() < args.dm_optin:
+                actions.append({'t': 0.0, 'action': 'dm_optin', 'guild': guild_id, 'user': user_id})
+
+        t = 0.0
+        for n in itertools.count():
+            t += rng.expovariate(args.recruits_per_hour / 3600)
+            if t >= duration:
+                break
+            lead = rng.uniform(args.lead_min * 60, args.lead_max * 60)
+            begin = start + t + lead
+            if rng.random() < args.align:
+                # 21:00 のような切りの良い時刻への集中を再現
+                begin = (begin // 3600 + 1) * 3600
+            begin -= begin % 60
+            required = rng.randint(2, 6)
+            ref = f"g{guild_id}-r{n}"
+            actions.append({
+                't': t, 'action': 'recruit', 'ref': ref, 'guild': guild_id, 'user': rng.choice(members),
+                'title': f"load test {ref}",
+                'date': datetime.datetime.fromtimestamp(begin, JST).strftime("%Y/%m/%d %H:%M"),
+                'location': "https://maps.example.com/",
+                'required': required,
+                'mode': rng.choices(modes, weights)[0],
+            })
+
+            joins = min(len(members), max(1, round(required * args.join_ratio)))
+            for user_id in rng.sample(members, joins):
+                joined = rng.uniform(t, t + lead)
+                actions.append({'t': joined, 'action': 'join', 'ref': ref, 'guild': guild_id, 'user': user_id})
+                if rng.random() < args.leave_rate:
+                    left = rng.uniform(joined, t + lead)
+                    actions.append({'t': left, 'action': 'leave', 'ref': ref, 'guild': guild_id, 'user': user_id})
+
+    actions.sort(key=lambda a: a['t'])
+    return actions
+
+
+def load_log(path):
+    """操作ログを読み込み (ヘッダー, 操作リスト) を返す。ヘッダーが無いログは None"""
+    with open(path, encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if lines and lines[0].get('header'):
+        return lines[0], lines[1:]
+    return None, lines
+
+
+def save_log(path, header, actions):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'header': True, **header}, ensure_ascii=False) + "\n")
+        for action in actions:
+            f.write(json.dumps(action, ensure_ascii=False) + "\n")
+
+
+def warn(message):
+    print(f"警告: {message}", file=sys.stderr)
+
+
+# --- シミュレーション本体 ---
+
+class Simulation:
+    def __init__(self, args, start, stats):
+        from database import db
+        from cogs import tickets
+
+        self.args = args
+        self.db = db
+        self.tickets = tickets
+        self.stats = stats
+        self.rng = random.Random(args.seed + 1)
+        self.clock = SimClock(start)
+        self.discord = FakeDiscord(self.clock, stats)
+        self.refs = {}
+        self.solving = set()
+
+        tickets.utc_now = lambda: self.clock.now
+        tickets.asyncio = SimAsyncio(self.clock)
+
+    async def setup(self):
+        await self.db.init_db()
+        instrument_db(self.db, self.stats)
+        self.view = self.tickets.TicketView()
+        self.cog = self.tickets.TicketsCog(FakeBot(self.discord))
+        # 実時間のループは止め、シミュレーション時計から1回ずつ呼び出す
+        self.cog.reminder_loop.cancel()
+        self.cog.reminder_job_loop.cancel()
+        instrument_render(self.cog, self.stats)
+
+    async def timed(self, name, coro):
+        # ハンドラ内 (およびそこから起動したタスク) のDB・描画時間だけを集計する
+        measured = HandlerMeasure()
+        token = current_handler.set(measured)
+        start = time.perf_counter()
+        try:
+            await coro
+        finally:
+            total = time.perf_counter() - start
+            current_handler.reset(token)
+            self.stats.handlers[name].append((total, measured.db, measured.render))
+
+    # --- 操作 ---
+
+    async def recruit(self, action):
+        interaction = FakeInteraction(self.discord, action['guild'], action['user'])
+        modal = self.tickets.RecruitModal()
+        modal.task_name._value = action['title']
+        modal.date_str._value = action['date']
+        modal.location._value = action['location']
+        modal.required_num._value = str(action['required'])
+        modal.reminder_mode._value = MODE_INPUT[action['mode']]
+        await self.timed('recruit', modal.on_submit(interaction))
+        if interaction.sent_message:
+            self.refs[action['ref']] = interaction.sent_message.id
+
+    async def click(self, action):
+        message_id = self.refs.get(action['ref'])
+        if message_id is None:
+            return
+        interaction = FakeInteraction(self.discord, action['guild'], action['user'], message_id)
+        button = self.view.join if action['action'] == 'join' else self.view.leave
+        await self.timed(action['action'], button.callback(interaction))
+
+    async def dm_optin(self, action):
+        await self.db.set_dm_optin(action['guild'], action['user'], True)
+
+    async def solve(self, message_id, guild_id, user_id):
+        spam = self.cog.active_spams.get(message_id)
+        if not spam or user_id not in spam['remaining']:
+            return
+        interaction = FakeInteraction(self.discord, guild_id, user_id)
+        await self.timed('stop_spam', self.cog.stop_spam.callback(self.cog, interaction, spam['codes'][user_id]))
+
+    # --- 定期処理 ---
+
+    async def reminder_tick(self):
+        async def tick():
+            await self.cog.reminder_loop()
+            # 鬼畜モードの開始処理 (バックグラウンドタスク) も計測に含める
+            await self.clock.settle()
+        await self.timed('reminder_loop', tick())
+        # 鬼畜モードが始まったら、参加者がコードを入力するまでの時間を割り当てる
+        for message_id, spam in self.cog.active_spams.items():
+            if message_id in self.solving:
+                continue
+            self.solving.add(message_id)
+            data = await self.db.get_event_data(message_id)
+            if not data:
+                continue
+            guild_id = data[0]['guild_id']
+            for user_id in spam['remaining']:
+                delay = self.rng.expovariate(1 / self.args.solve_delay)
+                self.clock.at(self.clock.now + delay, lambda m=message_id, g=guild_id, u=user_id: self.solve(m, g, u))
+
+    async def job_tick(self):
+        await self.timed('reminder_job_loop', self.cog.reminder_job_loop())
+
+    def schedule_periodic(self, interval, callback, end):
+        async def tick():
+            await callback()
+            if self.clock.now + interval <= end:
+                self.clock.at(self.clock.now + interval, tick)
+        self.clock.at(self.clock.now + interval, tick)
+
+    async def run(self, actions, horizon):
+        start = self.clock.now
+        end = start + horizon + self.args.drain * 60
+        handlers = {'recruit': self.recruit, 'join': self.click, 'leave': self.click, 'dm_optin': self.dm_optin}
+        for action in actions:
+            self.clock.at(start + action['t'], lambda a=action: handlers[a['action']](a))
+        self.schedule_periodic(60, self.reminder_tick, end)
+        self.schedule_periodic(5, self.job_tick, end)
+
+        wall = time.perf_counter()
+        await self.clock.run(end)
+        self.clock.cancel_all()
+        return time.perf_counter() - wall, end - start
+
+
+async def click_benchmark(args, stats):
+    """参加/キャンセルのクリックを連続で処理し、1プロセスで捌けるクリック数/秒を測る
+    APIは --api-latency-ms だけ実際に待つ"""
+    from database import db
+    from cogs import tickets
+
+    clock = SimClock(time.time())
+    discord = FakeDiscord(clock, stats, stats.api_latency)
+    view = tickets.TicketView()
+    events = []
+    for n in range(args.bench_events):
+        message_id = discord.snowflake()
+        await db.create_event(message_id, 101, 1, 1, f"bench {n}", "2026/01/01 00:00", "-", 99)
+        events.append(message_id)
+
+    results = {}
+    clicks_total = 0
+    for concurrency in (1, 8, 32, 128):
+        # 同時実行数が低いほど時間がかかるので、回数を同時実行数に比例させる
+        clicks = min(args.bench_clicks, concurrency * 20)
+        clicks_total += clicks
+        latencies = []
+        errors = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def click(i):
+            message_id = events[i % len(events)]
+            user_id = 1000 + (i // (2 * len(events))) % 50
+            interaction = FakeInteraction(discord, 1, user_id, message_id)
+            button = view.join if (i // len(events)) % 2 == 0 else view.leave
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await button.callback(interaction)
+                except Exception as e:
+                    # DBロック待ちのタイムアウトなど。失敗したクリックは処理能力に数えない
+                    errors.append(e)
+                    return
+                latencies.append(time.perf_counter() - start)
+
+        wall = time.perf_counter()
+        await asyncio.gather(*(click(i) for i in range(clicks)))
+        wall = time.perf_counter() - wall
+        results[concurrency] = (len(latencies) / wall, latencies, errors)
+    return results, clicks_total
+
+
+# --- レポート ---
+
+def ms(seconds):
+    return f"{seconds * 1000:8.2f}ms"
+
+
+def report(stats, wall, simulated):
+    print(f"\n== シミュレーション: {simulated / 3600:.1f}時間分を {wall:.1f}秒で実行 ==")
+
+    print("\n-- ハンドラ別 (実測, mean/p95 は1回あたり, それ以降は全呼び出しの合計: total = db + render + other) --")
+    print(f"{'handler':<20}{'calls':>8}{'mean':>12}{'p95':>12}"
+          f"{'total':>12}{'db':>12}{'render':>12}{'other':>12}")
+    for name, samples in sorted(stats.handlers.items()):
+        totals = sorted(s[0] for s in samples)
+        total, db_time, render = (sum(col) for col in zip(*samples))
+        p95 = totals[min(len(totals) - 1, int(len(totals) * 0.95))]
+        other = total - db_time - render
+        print(f"{name:<20}{len(samples):>8}{ms(total / len(samples)):>12}{ms(p95):>12}"
+              f"{ms(total):>12}{ms(db_time):>12}{ms(render):>12}{ms(other):>12}")
+
+    print("\n-- DB (実測) --")
+    for name, samples in sorted(stats.db.items(), key=lambda kv: -sum(kv[1])):
+        print(f"{name:<28}{len(samples):>8} calls  total {ms(sum(samples))}  mean {ms(sum(samples) / len(samples))}")
+
+    api_total = sum(stats.api_calls.values())
+    print(f"\n-- Discord API (呼び出し数 × 想定レイテンシ {ms(stats.api_latency).strip()}, * はグローバル制限の対象) --")
+    for kind, count in stats.api_calls.most_common():
+        mark = "*" if kind in GLOBAL_LIMITED_KINDS else " "
+        print(f"{mark}{kind:<27}{count:>8} calls  modeled {ms(count * stats.api_latency)}")
+    print(f"合計 {api_total} calls")
+    if stats.api_per_sec:
+        peak_sec, peak = max(stats.api_per_sec.items(), key=lambda kv: kv[1])
+        per_minute = Counter()
+        for sec, count in stats.api_per_sec.items():
+            per_minute[sec // 60] += count
+        over = sum(1 for count in stats.api_per_sec.values() if count > RATE_LIMIT_PER_SEC)
+        print(f"グローバル制限の対象: ピーク {peak} calls/秒 "
+              f"({datetime.datetime.fromtimestamp(peak_sec, JST):%m/%d %H:%M:%S}) / "
+              f"ピーク {max(per_minute.values())} calls/分 / "
+              f"{RATE_LIMIT_PER_SEC}/秒 超過 {over}秒")
+    count, window = CHANNEL_ROUTE_LIMIT
+    for kind in sorted(CHANNEL_LIMITED_KINDS):
+        windows = [n for (k, _, _), n in stats.channel_windows.items() if k == kind]
+        if windows:
+            over = sum(1 for n in windows if n > count)
+            print(f"チャンネルごとの {kind}: ピーク {max(windows)}回/{window}秒 / "
+                  f"{count}回/{window}秒 (想定値) 超過 {over}件")
+
+    handler_total, handler_db, handler_render = (
+        sum(col) for col in zip(*(s for samples in stats.handlers.values() for s in samples))
+    )
+    print("\n-- 時間の内訳 (ハンドラ内) --")
+    print(f"DB      {ms(handler_db)}")
+    print(f"描画    {ms(handler_render)}  (キャプチャ画像生成)")
+    print(f"その他  {ms(handler_total - handler_db - handler_render)}  (Embed作成・処理ロジック)")
+    print(f"API     {ms(api_total * stats.api_latency)}  (想定値)")
+    print(f"(ハンドラ外のDB {ms(stats.db_total - handler_db).strip()}: DM設定の投入など負荷試験側の処理)")
+
+
+def report_benchmark(bench, api_calls, clicks, api_latency):
+    print(f"\n-- クリック処理能力 (1プロセス, APIレイテンシ {ms(api_latency).strip()}) --")
+    for concurrency, (rate, latencies, errors) in bench.items():
+        p50 = ms(statistics.median(latencies)) if latencies else "       -"
+        line = f"同時実行 {concurrency:>3}: {rate:8.1f} clicks/秒  p50 {p50}"
+        if errors:
+            line += f"  失敗 {len(errors)}件 ({type(errors[0]).__name__}: {errors[0]})"
+        print(line)
+    # 失敗が出た同時実行数は持続可能とみなさない
+    healthy = {c: r for c, r in bench.items() if not r[2] and r[1]}
+    if not healthy:
+        print("持続可能な最大クリック数: 全ての同時実行数でクリックが失敗しました")
+        return
+    concurrency, (measured, _, _) = max(healthy.items(), key=lambda kv: kv[1][0])
+    # インタラクション応答を除き、レート制限の対象になる呼び出しだけで上限を出す
+    global_per_click = sum(n for k, n in api_calls.items() if k in GLOBAL_LIMITED_KINDS) / clicks
+    edits_per_click = api_calls['message_edit'] / clicks
+    global_limit = RATE_LIMIT_PER_SEC / global_per_click if global_per_click else float('inf')
+    count, window = CHANNEL_ROUTE_LIMIT
+    channel_limit = count / window / edits_per_click if edits_per_click else float('inf')
+    print(f"グローバル制限の対象 {global_per_click:.2f}回/click → 上限 {global_limit:.1f} clicks/秒 (全チャンネル合計)")
+    print(f"募集メッセージの編集 {edits_per_click:.2f}回/click → 上限 {channel_limit:.1f} clicks/秒 "
+          f"(1チャンネルあたり, {count}回/{window}秒 の想定値)")
+    if measured <= global_limit:
+        print(f"持続可能な最大クリック数: 約 {measured:.1f} clicks/秒 (処理能力で律速, 同時実行 {concurrency})")
+    else:
+        print(f"持続可能な最大クリック数: 約 {global_limit:.1f} clicks/秒 (グローバル制限で律速, 処理能力は {measured:.1f} clicks/秒)")
+    print(f"  ※ 1チャンネルに集中する場合は約 {min(measured, channel_limit):.1f} clicks/秒 が上限 (目安)")
+
+
+def build_parser():
+    p = argparse.ArgumentParser(description="募集・リマインダー処理の負荷試験ツール")
+    p.add_argument("--replay", help="操作ログ (JSONL) を再生する")
+    p.add_argument("--record", help="実行した操作ログを保存する")
+    p.add_argument("--seed", type=int, help="乱数シード (既定: 1, 再生時はログの値)")
+    p.add_argument("--start", help=f"シミュレーション開始時刻 (ISO形式, 既定: {DEFAULT_START}, 再生時はログの値)")
+    p.add_argument("--hours", type=float, default=24, help="操作を発生させる時間 (生成時のみ)")
+    p.add_argument("--drain", type=float, default=180, help="最後の操作後にリマインダーを流し切る時間 (分)")
+    p.add_argument("--guilds", type=int, default=10)
+    p.add_argument("--members", type=int, default=30, help="ギルドあたりのメンバー数")
+    p.add_argument("--recruits-per-hour", type=float, default=2, help="ギルドあたりの募集数/時間")
+    p.add_argument("--join-ratio", type=float, default=1.2, help="必要人数に対する参加クリック数の比")
+    p.add_argument("--leave-rate", type=float, default=0.1, help="参加後にキャンセルする確率")
+    p.add_argument("--mix", type=parse_mix, default=parse_mix("normal=0.6,many=0.3,brutal=0.1"),
+                   help="通知モードの比率 (例: normal=0.6,many=0.3,brutal=0.1)")
+    p.add_argument("--align", type=float, default=0.5, help="開始時刻を正時に揃える募集の割合")
+    p.add_argument("--lead-min", type=float, default=20, help="募集から開始までの最短時間 (分)")
+    p.add_argument("--lead-max", type=float, default=180, help="募集から開始までの最長時間 (分)")
+    p.add_argument("--dm-optin", type=float, default=0.2, help="多めモードのDMを希望するメンバーの割合")
+    p.add_argument("--solve-delay", type=float, default=60, help="鬼畜モードでコード入力までの平均秒数")
+    p.add_argument("--api-latency-ms", type=float, default=80, help="API 1回あたりの想定レイテンシ")
+    p.add_argument("--bench-clicks", type=int, default=2000, help="同時実行数ごとのクリック数の上限 (0で省略)")
+    p.add_argument("--bench-events", type=int, default=20)
+    p.add_argument("--db", help="初期データとして使うDBファイル (一時ディレクトリにコピーして使い、元のファイルは変更しない)")
+    return p
+
+
+def resolve_replay(args):
+    """ログのヘッダーから開始時刻とシードを決め、再生範囲を操作ログから求める"""
+    header, actions = load_log(args.replay)
+    if header is None:
+        warn("ログにヘッダーがありません。募集の日時は絶対時刻のため、--start が記録時と違うとリマインダーがずれます。")
+        header = {}
+    if args.start and header.get('start') and args.start != header['start']:
+        warn(f"--start {args.start} はログの開始時刻 {header['start']} と異なります。ログの値を使います。")
+    args.start = header.get('start') or args.start or DEFAULT_START
+    if args.seed is None:
+        args.seed = header.get('seed', 1)
+    horizon = max((a['t'] for a in actions), default=0.0)
+    return actions, horizon
+
+
+def prepare(args):
+    """(操作リスト, 操作を発生させる秒数) を返す"""
+    if args.replay:
+        actions, horizon = resolve_replay(args)
+    else:
+        args.start = args.start or DEFAULT_START
+        if args.seed is None:
+            args.seed = 1
+        horizon = args.hours * 3600
+        actions = generate_workload(args, datetime.datetime.fromisoformat(args.start).timestamp())
+
+    # シミュレーションは horizon + drain まで進むので、その範囲外の操作だけが実行されない
+    end = horizon + args.drain * 60
+    outside = [a for a in actions if not 0 <= a['t'] <= end]
+    if outside:
+        warn(f"{len(outside)}/{len(actions)} 件の操作がシミュレーション範囲 (0〜{end:.0f}秒) の外にあり、実行されません。")
+    if args.record:
+        save_log(args.record, {'start': args.start, 'seed': args.seed}, actions)
+    return actions, horizon
+
+
+async def run(args, actions, horizon):
+    start = datetime.datetime.fromisoformat(args.start).timestamp()
+    stats = Stats(args.api_latency_ms)
+    simulation = Simulation(args, start, stats)
+    await simulation.setup()
+    wall, simulated = await simulation.run(actions, horizon)
+    report(stats, wall, simulated)
+
+    if args.bench_clicks:
+        bench_stats = Stats(args.api_latency_ms)
+        bench, clicks = await click_benchmark(args, bench_stats)
+        report_benchmark(bench, bench_stats.api_calls, clicks, bench_stats.api_latency)
+
+
+def copy_db(source, destination):
+    """元のDBに合成データを書き込まないよう、一時ディレクトリにコピーする"""
+    if not os.path.exists(source):
+        raise SystemExit(f"DBファイルが見つかりません: {source}")
+    # WALモードや書き込み中でも整合性のあるコピーになるよう、SQLiteのバックアップAPIを使う
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    dst = sqlite3.connect(destination)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def main():
+    args = build_parser().parse_args()
+    actions, horizon = prepare(args)
+    random.seed(args.seed)  # キャプチャのコード生成を再現可能にする
+    with tempfile.TemporaryDirectory() as tmp:
+        # database.py はインポート時に DB_PATH を読むため、先に設定する
+        db_path = os.path.join(tmp, "loadtest.db")
+        if args.db:
+            copy_db(args.db, db_path)
+        os.environ["DB_PATH"] = db_path
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        asyncio.run(run(args, actions, horizon))
+
+
+if __name__ == "__main__":
+    main()